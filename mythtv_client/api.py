@@ -1,7 +1,21 @@
+import logging
+import queue
 import requests
+import threading
+from time import monotonic, sleep
 from datetime import date, datetime, timedelta, time
-from urllib.parse import urlencode
+from urllib.parse import urlencode, urlparse
 
+from .resilience import (
+    Metrics,
+    Policy,
+)
+from .scheduling import (
+    BULK,
+    INTERACTIVE,
+    NORMAL,
+    default_scheduler,
+)
 from .models import (
     ProgramGuide,
     RecRule,
@@ -22,6 +36,14 @@ from vtypes import (
 )
 
 
+logger = logging.getLogger(__name__)
+
+
+def _close(response):
+    if response is not None:
+        response.close()
+
+
 class API(object):
     endpoints = {}
 
@@ -38,8 +60,13 @@ class API(object):
             return endpoint_cls(self.api)
 
 
-    def __init__(self, url):
+    def __init__(self, url, policy=None, metrics=None, scheduler=None):
         self.url = url
+        self.host = urlparse(url).netloc
+        self.policy = policy or Policy()
+        self.metrics = metrics or Metrics()
+        # Pass a Scheduler to not share the default per-host caps.
+        self.scheduler = scheduler or default_scheduler
 
     def __getattr__(self, service):
         try:
@@ -48,7 +75,106 @@ class API(object):
             raise AttributeError('Unknown service {}'.format(service))
         return self.Service(self, endpoints)
 
-    def _request(self, service, endpoint, args, post=False):
+    def _send(self, service, endpoint, url, args, headers, post, priority, started=None,
+              abandoned=None):
+        timeout = self.policy.timeout_for(service, endpoint)
+        limiter = self.scheduler.limiter(self.host)
+        baseline = self.metrics.baseline(service, endpoint)
+        limiter.acquire(priority)
+        if abandoned is not None and abandoned.is_set():
+            # Decided while this was waiting for a slot, so don't send it.
+            limiter.discard()
+            return None
+        if started is not None:
+            started.set()
+        start = monotonic()
+        ok = False
+        try:
+            if post:
+                response = requests.post(url, data=args, headers=headers, timeout=timeout)
+            else:
+                response = requests.get(url, headers=headers, timeout=timeout)
+            ok = response.status_code < 500
+        finally:
+            latency = monotonic() - start
+            self.metrics.observe(service, endpoint, latency)
+            if abandoned is not None and abandoned.is_set():
+                # Nobody is waiting on this request any more, so how it
+                # went should not shrink the cap for everyone else.
+                limiter.discard()
+            else:
+                limiter.release(latency, ok=ok, baseline=baseline)
+        return response
+
+    def _send_hedged(self, service, endpoint, url, args, headers, priority):
+        """Send a GET, and if it has not answered within the policy's
+        hedging threshold of being sent, send a second and use
+        whichever answers first.
+
+        Each attempt runs on its own thread, so the only cap on how
+        many are in flight is the scheduler's, and the threshold is
+        timed from when the first attempt gets its slot rather than
+        from when it starts waiting for one. No hedge is sent if the
+        scheduler has no spare slot for it.
+
+        """
+        threshold = self.policy.hedge_after(self.metrics, service, endpoint)
+        if threshold is None:
+            return self._send(service, endpoint, url, args, headers, False, priority)
+
+        results = queue.Queue()
+        started = threading.Event()
+        decided = threading.Event()
+        lock = threading.Lock()
+
+        def attempt(is_hedge, started=None):
+            try:
+                outcome = (is_hedge, self._send(
+                    service, endpoint, url, args, headers, False, priority,
+                    started=started, abandoned=decided), None)
+            except Exception as exc:
+                outcome = (is_hedge, None, exc)
+            finally:
+                if started is not None:
+                    started.set()
+            with lock:
+                if decided.is_set():
+                    _close(outcome[1])
+                else:
+                    results.put(outcome)
+
+        threading.Thread(target=attempt, args=(False, started), daemon=True).start()
+        started.wait()
+        try:
+            is_hedge, response, error = results.get(timeout=threshold)
+            pending = 0
+        except queue.Empty:
+            if self.scheduler.limiter(self.host).has_spare():
+                self.metrics.incr(service, endpoint, 'hedge')
+                threading.Thread(target=attempt, args=(True,), daemon=True).start()
+                pending = 1
+            else:
+                self.metrics.incr(service, endpoint, 'hedge_skipped')
+                pending = 0
+            is_hedge, response, error = results.get()
+
+        if error is not None and pending:
+            is_hedge, response, error = results.get()
+
+        # Any attempt still running is now abandoned, and any that
+        # already finished lost.
+        with lock:
+            decided.set()
+            while not results.empty():
+                _close(results.get_nowait()[1])
+
+        if error is not None:
+            raise error
+        if is_hedge:
+            self.metrics.incr(service, endpoint, 'hedge_won')
+        return response
+
+    def _request(self, service, endpoint, args, post=False, priority=NORMAL):
         args = args or {}
         if post:
             url = '{url}/{service}/{endpoint}'.format(
@@ -63,18 +189,42 @@ class API(object):
                 args=urlencode(args))
         headers = dict(Accept='application/json')
 
-        if post:
-            response = requests.post(url, data=args, headers=headers)
-        else:
-            response = requests.get(url, headers=headers)
+        # Only GETs are idempotent, so only GETs are retried or hedged.
+        attempts = self.policy.attempts_for(post)
+        for attempt in range(attempts):
+            is_last = (attempt + 1 == attempts)
+            if attempt:
+                self.metrics.incr(service, endpoint, 'retry')
+                sleep(self.policy.backoff_for(attempt))
+            try:
+                if post:
+                    response = self._send(service, endpoint, url, args, headers, True, priority)
+                else:
+                    response = self._send_hedged(service, endpoint, url, args, headers, priority)
+            except (requests.Timeout, requests.ConnectionError) as exc:
+                if isinstance(exc, requests.Timeout):
+                    self.metrics.incr(service, endpoint, 'timeout')
+                else:
+                    self.metrics.incr(service, endpoint, 'connection_error')
+                if is_last:
+                    self.metrics.incr(service, endpoint, 'failure')
+                    raise
+                continue
+            except Exception:
+                self.metrics.incr(service, endpoint, 'failure')
+                raise
+            if response.status_code in self.policy.retry_statuses and not is_last:
+                self.metrics.incr(service, endpoint, 'http_error')
+                continue
+            break
 
         if response.status_code != 200:
-            print('Endpoint: {}/{}'.format(service, endpoint))
-            from pprint import pprint
-            print('###### args ########')
-            pprint(args)
-            print('###### content #####')
-            print(response.content)
+            self.metrics.incr(service, endpoint, 'failure')
+            logger.error(
+                'Endpoint %s/%s returned %s, args: %r, content: %r',
+                service, endpoint, response.status_code, args, response.content)
+        else:
+            self.metrics.incr(service, endpoint, 'success')
         response.raise_for_status()
         return response.json()
 
@@ -99,6 +249,12 @@ class Endpoint(object):
     args = Validator()
     # A dict of (response-key, init-kwarg) -> Validator()
     response_args = {}
+    # Requests from the same API are let through by priority when the
+    # backend is busy, so interactive calls are not stuck behind bulk ones.
+    priority = NORMAL
+    # Names of keyword arguments that are handled by the client when
+    # decoding the response, rather than being sent to the backend.
+    client_args = ()
 
     def __init__(self, api):
         self.api = api
@@ -121,15 +277,24 @@ class Endpoint(object):
         validator = self.args
         return validator.to_strings(args)
 
+    def _decode_response(self, response):
+        kwargs = {}
+        for (response_key, init_kwarg), validator in self.response_args.items():
+            kwargs[init_kwarg] = validator.to_types(response[response_key])
+        return self.model(**kwargs)
+
     def _request(self, args=None):
-        args = self._get_args(args or {})
+        args = dict(args or {})
+        client_kwargs = {}
+        for name in self.client_args:
+            if name in args:
+                client_kwargs[name] = args.pop(name)
+        args = self._get_args(args)
 
-        response = self.api._request(self.service, self.endpoint, args=args, post=self.is_post)
+        response = self.api._request(
+            self.service, self.endpoint, args=args, post=self.is_post, priority=self.priority)
         if not self.is_post:
-            kwargs = {}
-            for (response_key, init_kwarg), validator in self.response_args.items():
-                kwargs[init_kwarg] = validator.to_types(response[response_key])
-            return self.model(**kwargs)
+            return self._decode_response(response, **client_kwargs)
 
 
 @API.register
@@ -137,19 +302,39 @@ class ProgramGuideEndpoint(Endpoint):
     model = ProgramGuide
     service = 'Guide'
     endpoint = 'GetProgramGuide'
+    priority = BULK
     args = Validator(
         StartTime=VDateTime(),
         EndTime=VDateTime(),
+        # Without Details the backend omits most per-program detail.
+        Details=VBool(required=False),
+        ChannelGroupId=VInt(required=False),
+        StartIndex=VInt(required=False),
+        Count=VInt(required=False),
+        WithInvisible=VBool(required=False),
     )
     response_args = {
         ('ProgramGuide', '_guide'): ProgramGuide.args['_guide'],
     }
+    # Pass `fields=[...]` to decode and retain only those program
+    # fields, eg `fields=['VideoProps']` for a grid view, and
+    # `executor=` (eg a ProcessPoolExecutor) to decode channels in
+    # parallel, `chunk_size` channels at a time.
+    client_args = ('fields', 'executor', 'chunk_size')
+
+    def _decode_response(self, response, fields=None, executor=None, chunk_size=None):
+        return self.model(_guide=ProgramGuide.decode(
+            response['ProgramGuide'],
+            program_fields=fields,
+            executor=executor,
+            chunk_size=chunk_size))
 
 
 @API.register
 class GetRecordSchedule(Endpoint):
     service = 'Dvr'
     endpoint = 'GetRecordSchedule'
+    priority = INTERACTIVE
     model = RecRule
     args = Validator(
         StartTime=VDateTime(),
@@ -168,6 +353,7 @@ class AddRecordSchedule(Endpoint):
     service = 'Dvr'
     endpoint = 'AddRecordSchedule'
     callable_action = 'record'
+    priority = INTERACTIVE
     is_post = True
     # Validation for this is nearly-but-not-quite the same as the
     # validation for a RecRule.
@@ -186,11 +372,23 @@ class AddRecordSchedule(Endpoint):
         )
     )
 
-    def record(self, program):
+    def record(self, program, planner=None):
+        """Schedule a single recording of `program`.
+
+        If a `Planner` is given, `TunerConflictError` is raised before
+        anything is posted if there is no tuner free for it, allowing
+        for the schedule's start and end offsets. On success the
+        recording is added to the planner, so that a bulk run of
+        `record` calls cannot over-subscribe the tuners.
+
+        """
         schedule = self.api.Dvr.GetRecordSchedule(
             StartTime=program.StartTime,
             ChanId=program.ChanId)
         args = schedule._recrule
+        offsets = dict(start_offset=args['StartOffset'], end_offset=args['EndOffset'])
+        if planner is not None:
+            planner.check(program, **offsets)
         args['Type'] = 'Single Record'
         args['Filter'] = '1024'
         args['Station'] = args['CallSign']
@@ -207,12 +405,15 @@ class AddRecordSchedule(Endpoint):
         for remove_key in remove_keys:
             del args[remove_key]
         self.post(**args)
+        if planner is not None:
+            planner.add(program, preferred_input=args['PreferredInput'], **offsets)
 
 
 @API.register
 class GetRecordScheduleList(Endpoint):
     service = 'Dvr'
     endpoint = 'GetRecordScheduleList'
+    priority = BULK
     model = RecRuleList
     args = (
         Validator(
@@ -0,0 +1,86 @@
+import collections
+
+from .models import chan_num_key, default_rank
+
+
+Showing = collections.namedtuple('Showing', ['program', 'video_props', 'rank'])
+
+
+class GuideIndex(object):
+    """Groups the programs in a `ProgramGuide` by series and by
+    episode, keeping only the best copy of each airing.
+
+    Series are keyed on `SeriesId` and episodes on `ProgramId`,
+    falling back to the title (and subtitle, for episodes) when the
+    guide does not give one. Airings are the same if they have the
+    same start and end time, and the best copy is the one with the
+    lowest `rank(channel, video_props)`.
+
+    The index is built in one pass over the guide, after which each
+    lookup returns a precomputed tuple of `Showing`s in start time
+    order.
+
+    """
+
+    def __init__(self, guide, rank=default_rank):
+        groups = {
+            'series': collections.defaultdict(dict),
+            'episode': collections.defaultdict(dict),
+            'title': collections.defaultdict(dict),
+        }
+
+        for ch in guide.channels:
+            for pr in ch.programs:
+                video_props = pr.video_props
+                showing = Showing(pr, video_props, rank(ch, video_props))
+                slot = (pr.StartTime, pr.EndTime)
+                for name, key in (
+                        ('series', self.series_key(pr)),
+                        ('episode', self.episode_key(pr)),
+                        ('title', self.title_key(pr.Title))):
+                    best = groups[name][key]
+                    if slot not in best or showing.rank < best[slot].rank:
+                        best[slot] = showing
+
+        self._groups = {
+            name: {
+                key: tuple(sorted(best.values(), key=lambda showing: showing.program.StartTime))
+                for key, best in keyed.items()
+            }
+            for name, keyed in groups.items()
+        }
+
+    @staticmethod
+    def title_key(title):
+        return ('title', title.lower())
+
+    @classmethod
+    def series_key(cls, program):
+        series_id = program._program.get('SeriesId')
+        if series_id:
+            return ('series', series_id)
+        return cls.title_key(program.Title)
+
+    @classmethod
+    def episode_key(cls, program):
+        program_id = program._program.get('ProgramId')
+        if program_id:
+            return ('program', program_id)
+        return cls.title_key(program.Title) + (program._program.get('SubTitle') or '',)
+
+    def series(self, series_id):
+        return self._groups['series'].get(('series', series_id), ())
+
+    def episode(self, program_id):
+        return self._groups['episode'].get(('program', program_id), ())
+
+    def title(self, title):
+        return self._groups['title'].get(self.title_key(title), ())
+
+    def series_of(self, program):
+        """All airings of the series `program` belongs to."""
+        return self._groups['series'].get(self.series_key(program), ())
+
+    def episode_of(self, program):
+        """All airings of the same episode as `program`."""
+        return self._groups['episode'].get(self.episode_key(program), ())
@@ -1,4 +1,7 @@
 import collections
+import collections.abc
+import itertools
+import re
 from enum import Enum
 
 from vtypes import (
@@ -20,7 +23,11 @@ from vtypes import (
 class Props(object):
     @classmethod
     def _attrs(cls):
-        return [name for name in dir(cls) if not name.startswith('_') and name != 'decode']
+        # Cached per subclass, as decode is called for every program.
+        if '_attr_names' not in cls.__dict__:
+            cls._attr_names = [
+                name for name in dir(cls) if not name.startswith('_') and name != 'decode']
+        return cls._attr_names
 
     @classmethod
     def decode(cls, props):
@@ -81,6 +88,19 @@ class VideoProps(Props):
     VID_1080 = 16
 
 
+def chan_num_key(chan_num):
+    """Sort key for a `ChanNum`, which may be eg `101` or `2_1`."""
+    return tuple(int(part) for part in re.findall(r'\d+', chan_num))
+
+
+def default_rank(channel, video_props):
+    """Rank copies of the same airing, lowest is best: HD copies
+    first, then the lowest channel number.
+
+    """
+    return (not (video_props & VideoProps.VID_HDTV), chan_num_key(channel.ChanNum))
+
+
 class Base(object):
     attr_key = None
     attr_keys = []
@@ -91,7 +111,7 @@ class Base(object):
     def __getattr__(self, attr):
         for attr_key in self._get_attr_keys():
             obj = getattr(self, attr_key)
-            if isinstance(obj, dict) and (attr in obj):
+            if isinstance(obj, collections.abc.Mapping) and (attr in obj):
                 return obj[attr]
             try:
                 return getattr(obj, attr)
@@ -139,7 +159,10 @@ class Base(object):
 class Program(Base):
     attr_keys = ['_program', 'channel']
     repr_attrs = ['Title', 'StartTime', 'EndTime', 'ChannelName']
-    validator = Validator(
+    # Fields kept by a projection regardless of what is requested, as
+    # they are needed to repr, search and de-duplicate programs.
+    key_fields = ('Title', 'StartTime', 'EndTime')
+    field_validators = dict(
         StartTime=VString(),
         VideoProps=VString(),
         Repeat=VString(),
@@ -176,50 +199,156 @@ class Program(Base):
         ),
         SubTitle=VString(),
         EndTime=VString(),
+        SeriesId=VString(required=False),
+        ProgramId=VString(required=False),
     )
+    validator = Validator(**field_validators)
+
+    @classmethod
+    def projected_fields(cls, fields):
+        return set(fields) | set(cls.key_fields)
+
+    @classmethod
+    def projected_validator(cls, fields):
+        fields = cls.projected_fields(fields)
+        return Validator(**{
+            name: validator
+            for name, validator in cls.field_validators.items()
+            if name in fields
+        })
+
+    @property
+    def video_props(self):
+        # VideoProps may have been projected away, treat that as unknown.
+        return int(self._program.get('VideoProps') or 0)
 
     @property
     def video_props_list(self):
-        return VideoProps.decode(int(self.VideoProps))
+        return VideoProps.decode(self.video_props)
 
 
 class Channel(Base):
     attr_key = '_channel'
     repr_attrs = ['ChanNum', 'ChannelName']
-    validator = Validator(
+    field_validators = dict(
         ChannelName=VString(),
         ChanId=VString(),
         CallSign=VString(),
         IconURL=VString(),
         ChanNum=VString(),
+    )
+    validator = Validator(
         Programs=VList(of=VValidatorDict(validator=Program.validator)),
+        **field_validators
     )
 
+    @classmethod
+    def projected_validator(cls, program_fields):
+        return Validator(
+            Programs=VList(of=VValidatorDict(
+                validator=Program.projected_validator(program_fields))),
+            **cls.field_validators
+        )
+
+    @classmethod
+    def project(cls, channel, program_fields):
+        """Return a copy of the raw `channel` dict with each program
+        stripped down to `program_fields` (plus `Program.key_fields`).
+
+        """
+        fields = Program.projected_fields(program_fields)
+        channel = dict(channel)
+        channel['Programs'] = [
+            {name: value for name, value in pr_dict.items() if name in fields}
+            for pr_dict in channel.get('Programs', [])
+        ]
+        return channel
+
     @property
     def programs(self):
         for pr_dict in self._channel['Programs']:
             yield Program(pr_dict, self)
 
 
+def _decode_channels(channels, program_fields=None):
+    """Decode a list of raw channel dicts, which must already have
+    been projected to `program_fields` if that is given. This is
+    module-level so that it can be run on a process pool.
+
+    """
+    if program_fields is None:
+        validator = Channel.validator
+    else:
+        validator = Channel.projected_validator(program_fields)
+    return [validator.to_types(ch_dict) for ch_dict in channels]
+
+
 class ProgramGuide(Base):
     attr_key = '_guide'
     repr_attrs = ['StartTime', 'EndTime']
 
+    field_validators = dict(
+        AsOf=VString(),
+        EndTime=VString(),
+        ProtoVer=VString(),
+        StartTime=VString(),
+        StartIndex=VString(),
+        Version=VString(),
+        TotalAvailable=VString(),
+        Count=VString(),
+        Details=VString(),
+    )
     args = {
         '_guide': Validator(
-            AsOf=VString(),
-            EndTime=VString(),
-            ProtoVer=VString(),
-            StartTime=VString(),
-            StartIndex=VString(),
-            Version=VString(),
-            TotalAvailable=VString(),
-            Count=VString(),
             Channels=VList(of=VValidatorDict(validator=Channel.validator)),
             # Channels=VList(of=VDict()),
-            Details=VString(),
+            **field_validators
         ),
     }
+    # Validates everything but the channels, for when those are
+    # decoded separately.
+    header_validator = Validator(**field_validators)
+    # Channels per chunk when decoding on an executor.
+    decode_chunk_size = 50
+
+    @classmethod
+    def decode(cls, guide, program_fields=None, executor=None, chunk_size=None):
+        """Validate a raw `ProgramGuide` response dict.
+
+        If `program_fields` is given, only those program fields are
+        retained and decoded, so that eg a grid view need not pay for
+        the `Recording` and `Artwork` blocks.
+
+        If `executor` is given, typically a
+        `concurrent.futures.ProcessPoolExecutor`, the channels are
+        decoded on it in chunks of `chunk_size` (by default
+        `decode_chunk_size`) and reassembled in order. Projection is
+        done before chunking, so with `program_fields` only the kept
+        fields are pickled to the workers and back. Without it the
+        full `Recording` and `Artwork` blocks make both trips, and
+        there may be little or nothing to gain.
+
+        """
+        if chunk_size is None:
+            chunk_size = cls.decode_chunk_size
+        if chunk_size < 1:
+            raise ValueError('chunk_size must be at least 1, got {}'.format(chunk_size))
+        if program_fields is None and executor is None:
+            return cls.args['_guide'].to_types(guide)
+
+        channels = guide.get('Channels', [])
+        if program_fields is not None:
+            channels = [Channel.project(ch_dict, program_fields) for ch_dict in channels]
+        if executor is None:
+            decoded = [_decode_channels(channels, program_fields)]
+        else:
+            chunks = [channels[i:i + chunk_size] for i in range(0, len(channels), chunk_size)]
+            decoded = executor.map(_decode_channels, chunks, itertools.repeat(program_fields))
+
+        header = {key: value for key, value in guide.items() if key != 'Channels'}
+        decoded_guide = cls.header_validator.to_types(header)
+        decoded_guide['Channels'] = list(itertools.chain.from_iterable(decoded))
+        return decoded_guide
 
     @property
     def channels(self):
@@ -241,12 +370,7 @@ class ProgramGuide(Base):
             keyed = collections.defaultdict(list)
 
             def _pick_best(dups):
-                hd = []
-                ordered = sorted(dups, key=lambda pr: int(pr.channel.ChanNum))
-                for pr in ordered:
-                    if 'hdtv' in pr.video_props_list:
-                        return pr
-                return ordered[0]
+                return min(dups, key=lambda pr: default_rank(pr.channel, pr.video_props))
 
             for pr in matches:
                 key = (pr.Title, pr.StartTime, pr.EndTime)
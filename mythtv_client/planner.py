@@ -0,0 +1,239 @@
+import bisect
+import collections
+import heapq
+from datetime import datetime, timedelta, timezone
+
+from .models import RecordingType
+
+
+Airing = collections.namedtuple('Airing', ['start', 'end', 'program', 'rule', 'input'])
+
+
+class TunerConflictError(Exception):
+    def __init__(self, program, load, tuners):
+        self.program = program
+        self.load = load
+        self.tuners = tuners
+        super().__init__(
+            'Recording {!r} would need {} tuners, only {} available'.format(program, load + 1, tuners))
+
+
+def to_utc(value):
+    """Return `value`, a guide time string or a datetime, as a naive
+    UTC datetime.
+
+    """
+    if isinstance(value, str):
+        value = datetime.strptime(value, '%Y-%m-%dT%H:%M:%SZ')
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+class Planner(object):
+    """Works out locally which programs the active rules in a
+    `RecRuleList` will record from a `ProgramGuide`, and how many
+    tuners that needs.
+
+    Rules are matched to programs by title, then by type: a single
+    record by channel and start time, daily and weekly by channel and
+    time of day (and weekday), record one by its first airing, and
+    record all by every airing, once per time slot. Each airing is
+    widened by the rule's `StartOffset`/`EndOffset` minutes. Only
+    airings ending after `now` are kept. Guide times are UTC, so daily
+    and weekly matching is by UTC time of day. A showing matched by
+    more than one rule, on any channel, is only planned once.
+
+    Single, daily and weekly rules without a `StartTime` are skipped.
+
+    `tuners`, if given, is the number of recordings that can run at
+    once, and is what `check` tests against.
+
+    """
+
+    def __init__(self, rec_rules, guide, tuners=None, now=None):
+        self.tuners = tuners
+        self.now = to_utc(now or datetime.now(timezone.utc))
+
+        by_title = collections.defaultdict(list)
+        for pr in guide.programs:
+            by_title[pr.Title.lower()].append(pr)
+
+        candidates = []
+        for rule in rec_rules:
+            if rule.Inactive or not rule.Type.is_on:
+                continue
+            candidates.extend(self._expand(rule, by_title.get(rule.Title.lower(), [])))
+
+        self.airings = []
+        self._by_showing = collections.defaultdict(list)
+        for airing in sorted(candidates, key=self._sort_key):
+            if not self.planned(airing.program):
+                self.airings.append(airing)
+                self._index_showing(airing)
+
+        self._starts = sorted(airing.start for airing in self.airings)
+        self._ends = sorted(airing.end for airing in self.airings)
+
+    @staticmethod
+    def _sort_key(airing):
+        return (airing.start, airing.end)
+
+    @staticmethod
+    def _showing_keys(program):
+        """Keys under which airings of the same showing as `program`
+        are found: the same channel and start, or another copy of the
+        same title at the same start.
+
+        """
+        start = to_utc(program.StartTime)
+        return [
+            ('channel', str(program.channel.ChanId), start),
+            ('title', program.Title.lower(), start),
+        ]
+
+    def _index_showing(self, airing):
+        for key in self._showing_keys(airing.program):
+            self._by_showing[key].append(airing)
+
+    def _remove(self, airing):
+        self.airings = [other for other in self.airings if other is not airing]
+        del self._starts[bisect.bisect_left(self._starts, airing.start)]
+        del self._ends[bisect.bisect_left(self._ends, airing.end)]
+        for key in self._showing_keys(airing.program):
+            self._by_showing[key] = [
+                other for other in self._by_showing[key] if other is not airing]
+
+    def planned(self, program):
+        """Return the airings already planned for the same showing as
+        `program`.
+
+        """
+        found = []
+        for key in self._showing_keys(program):
+            for airing in self._by_showing.get(key, []):
+                if not any(airing is other for other in found):
+                    found.append(airing)
+        return found
+
+    def _airing(self, rule, pr):
+        start = to_utc(pr.StartTime) - timedelta(minutes=rule.StartOffset)
+        end = to_utc(pr.EndTime) + timedelta(minutes=rule.EndOffset)
+        return Airing(start, end, pr, rule, rule.PreferredInput)
+
+    def _expand(self, rule, programs):
+        rule_type = rule.Type
+        if rule_type in (RecordingType.single_record, RecordingType.record_daily,
+                         RecordingType.record_weekly):
+            if rule.StartTime is None:
+                return []
+            rule_start = to_utc(rule.StartTime)
+            programs = [pr for pr in programs if int(pr.channel.ChanId) == rule.ChanId]
+            if rule_type == RecordingType.single_record:
+                programs = [pr for pr in programs if to_utc(pr.StartTime) == rule_start]
+            else:
+                programs = [
+                    pr for pr in programs
+                    if to_utc(pr.StartTime).time() == rule_start.time()]
+                if rule_type == RecordingType.record_weekly:
+                    programs = [
+                        pr for pr in programs
+                        if to_utc(pr.StartTime).weekday() == rule_start.weekday()]
+
+        airings = []
+        seen_slots = set()
+        for pr in programs:
+            airing = self._airing(rule, pr)
+            slot = (pr.StartTime, pr.EndTime)
+            if airing.end <= self.now or slot in seen_slots:
+                continue
+            seen_slots.add(slot)
+            airings.append(airing)
+
+        if rule_type == RecordingType.record_one and airings:
+            airings = [min(airings, key=lambda airing: airing.start)]
+        return airings
+
+    def add(self, program, start_offset=0, end_offset=0, rule=None, preferred_input=0):
+        """Add an airing for `program`, eg once it has been scheduled,
+        replacing any already planned for the same showing.
+
+        """
+        for planned in self.planned(program):
+            self._remove(planned)
+        airing = Airing(
+            to_utc(program.StartTime) - timedelta(minutes=start_offset),
+            to_utc(program.EndTime) + timedelta(minutes=end_offset),
+            program, rule, preferred_input)
+        self.airings.append(airing)
+        self.airings.sort(key=self._sort_key)
+        bisect.insort(self._starts, airing.start)
+        bisect.insort(self._ends, airing.end)
+        self._index_showing(airing)
+        return airing
+
+    def load_at(self, when, exclude=()):
+        """Return the number of recordings running at `when`, not
+        counting the airings in `exclude`.
+
+        """
+        load = bisect.bisect_right(self._starts, when) - bisect.bisect_right(self._ends, when)
+        return load - sum(1 for airing in exclude if airing.start <= when < airing.end)
+
+    def load_between(self, start, end, exclude=()):
+        """Return the most recordings running at once in [start, end),
+        not counting the airings in `exclude`.
+
+        """
+        load = self.load_at(start, exclude)
+        first = bisect.bisect_right(self._starts, start)
+        last = bisect.bisect_left(self._starts, end)
+        for when in self._starts[first:last]:
+            load = max(load, self.load_at(when, exclude))
+        return load
+
+    def check(self, program, start_offset=0, end_offset=0):
+        """Raise `TunerConflictError` if recording `program` as well
+        would need more than `tuners` tuners. Airings already planned
+        for the same showing are not counted against it.
+
+        """
+        if self.tuners is None:
+            return
+        start = to_utc(program.StartTime) - timedelta(minutes=start_offset)
+        end = to_utc(program.EndTime) + timedelta(minutes=end_offset)
+        load = self.load_between(start, end, exclude=self.planned(program))
+        if load >= self.tuners:
+            raise TunerConflictError(program, load, self.tuners)
+
+    def overlaps(self):
+        """Return a list of pairs of airings that overlap in time."""
+        found = []
+        active = []
+        for index, airing in enumerate(self.airings):
+            while active and active[0][0] <= airing.start:
+                heapq.heappop(active)
+            found.extend((self.airings[other], airing) for _, other in active)
+            heapq.heappush(active, (airing.end, index))
+        return found
+
+    def peak(self, preferred_input=None):
+        """Return (count, when) for the most recordings running at
+        once, optionally only counting airings preferring that input.
+
+        """
+        events = []
+        for airing in self.airings:
+            if preferred_input is None or airing.input == preferred_input:
+                events.append((airing.start, 1))
+                events.append((airing.end, -1))
+        # Ends sort before starts at the same time, so back-to-back
+        # recordings do not count as concurrent.
+        events.sort()
+        count = best = 0
+        best_when = None
+        for when, delta in events:
+            count += delta
+            if count > best:
+                best, best_when = count, when
+        return best, best_when
@@ -0,0 +1,112 @@
+import collections
+import math
+import random
+import threading
+
+
+class Metrics(object):
+    """Counts request outcomes and keeps a window of recent latencies,
+    both per (service, endpoint).
+
+    Outcomes counted are `success`, `failure` (including unexpected
+    exceptions), `timeout`, `connection_error`, `http_error`, `retry`,
+    `hedge` (a second GET was sent), `hedge_won` (the second GET
+    answered first) and `hedge_skipped` (no slot was free for one).
+
+    Latencies are recorded for every attempt that was sent, including
+    those that then failed or timed out.
+
+    """
+
+    def __init__(self, window=200):
+        self.window = window
+        self.counts = collections.Counter()
+        self._latencies = {}
+        self._lock = threading.Lock()
+
+    def incr(self, service, endpoint, outcome):
+        with self._lock:
+            self.counts[(service, endpoint, outcome)] += 1
+
+    def observe(self, service, endpoint, seconds):
+        with self._lock:
+            key = (service, endpoint)
+            if key not in self._latencies:
+                self._latencies[key] = collections.deque(maxlen=self.window)
+            self._latencies[key].append(seconds)
+
+    def latencies(self, service, endpoint):
+        with self._lock:
+            return list(self._latencies.get((service, endpoint), []))
+
+    def percentile(self, service, endpoint, pct, min_samples=1):
+        """Return the `pct` percentile latency in seconds, or None if
+        fewer than `min_samples` latencies have been observed.
+
+        """
+        samples = sorted(self.latencies(service, endpoint))
+        if not samples or len(samples) < min_samples:
+            return None
+        index = int(math.ceil(pct / 100.0 * len(samples))) - 1
+        return samples[max(0, min(index, len(samples) - 1))]
+
+    def baseline(self, service, endpoint, min_samples=10):
+        """Return the median latency, or None if there are too few
+        samples to say.
+
+        """
+        return self.percentile(service, endpoint, 50, min_samples=min_samples)
+
+    def outcomes(self, service, endpoint):
+        with self._lock:
+            return {
+                outcome: count
+                for (srv, ep, outcome), count in self.counts.items()
+                if (srv, ep) == (service, endpoint)
+            }
+
+
+class Policy(object):
+    """How `API` should time out, retry and hedge requests.
+
+    `timeout` is the default timeout in seconds passed to `requests`,
+    and `timeouts` maps (service, endpoint) to an override. Only GETs
+    are retried, up to `retries` times, on timeouts, connection errors
+    and any status in `retry_statuses`; the sleep before retry `n` is
+    drawn uniformly from [0, min(max_backoff, backoff * 2 ** n)].
+
+    If `hedge_percentile` is set, a GET that has not answered within
+    that percentile of the endpoint's observed latency has a second,
+    identical GET sent, and whichever answers first is used. No
+    hedging is done until `hedge_min_samples` latencies are known.
+
+    """
+
+    def __init__(self, timeout=30, timeouts=None, retries=2, backoff=0.1, max_backoff=5,
+                 retry_statuses=(500, 502, 503, 504), hedge_percentile=None,
+                 hedge_min_samples=20):
+        self.timeout = timeout
+        self.timeouts = timeouts or {}
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.retry_statuses = set(retry_statuses)
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+
+    def timeout_for(self, service, endpoint):
+        return self.timeouts.get((service, endpoint), self.timeout)
+
+    def attempts_for(self, post):
+        if post:
+            return 1
+        return self.retries + 1
+
+    def backoff_for(self, attempt):
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def hedge_after(self, metrics, service, endpoint):
+        if self.hedge_percentile is None:
+            return None
+        return metrics.percentile(
+            service, endpoint, self.hedge_percentile, min_samples=self.hedge_min_samples)
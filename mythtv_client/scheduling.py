@@ -0,0 +1,111 @@
+import heapq
+import itertools
+import threading
+from time import monotonic
+
+
+# Request priorities, lower goes first.
+INTERACTIVE = 0
+NORMAL = 1
+BULK = 2
+
+
+class HostLimiter(object):
+    """Caps the requests in flight to a single host.
+
+    The cap is adjusted AIMD-style: each request that succeeds without
+    being slow raises it by roughly one per cap's worth of requests,
+    and a failure or slow response multiplies it by `decrease`, at
+    most once per `target_latency`. Waiting requests are let through
+    by priority, then in arrival order.
+
+    A response is slow if it took over `target_latency` seconds and,
+    when the endpoint's usual latency is known, over `slow_factor`
+    times that too, so that endpoints that are always slow, such as
+    a full guide fetch, do not drag the cap down.
+
+    """
+
+    def __init__(self, initial=4, minimum=1, maximum=16, target_latency=2.0, decrease=0.5,
+                 slow_factor=3):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_latency = target_latency
+        self.decrease = decrease
+        self.slow_factor = slow_factor
+        self.in_flight = 0
+        self._waiting = []
+        self._counter = itertools.count()
+        self._last_decrease = None
+        self._cond = threading.Condition()
+
+    def _has_capacity(self):
+        return self.in_flight < max(self.minimum, int(self.limit))
+
+    def has_spare(self):
+        """Whether a request could be sent now without waiting."""
+        with self._cond:
+            return not self._waiting and self._has_capacity()
+
+    def acquire(self, priority=NORMAL):
+        with self._cond:
+            ticket = (priority, next(self._counter))
+            heapq.heappush(self._waiting, ticket)
+            while self._waiting[0] != ticket or not self._has_capacity():
+                self._cond.wait()
+            heapq.heappop(self._waiting)
+            self.in_flight += 1
+            self._cond.notify_all()
+
+    def is_slow(self, latency, baseline=None):
+        if latency <= self.target_latency:
+            return False
+        return baseline is None or latency > baseline * self.slow_factor
+
+    def release(self, latency, ok=True, baseline=None):
+        """Give back a slot, adjusting the cap by how the request went.
+        `baseline` is the endpoint's usual latency, if known.
+
+        """
+        with self._cond:
+            self.in_flight -= 1
+            now = monotonic()
+            if ok and not self.is_slow(latency, baseline):
+                self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+            elif self._last_decrease is None or now - self._last_decrease > self.target_latency:
+                self.limit = max(self.minimum, self.limit * self.decrease)
+                self._last_decrease = now
+            self._cond.notify_all()
+
+    def discard(self):
+        """Give back a slot without adjusting the cap, eg for a
+        request whose result was thrown away.
+
+        """
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+
+class Scheduler(object):
+    """Holds a `HostLimiter` per host, so that `API` instances sharing
+    a scheduler also share the cap for a backend.
+
+    """
+
+    def __init__(self, **limiter_kwargs):
+        self.limiter_kwargs = limiter_kwargs
+        self._limiters = {}
+        self._lock = threading.Lock()
+
+    def limiter(self, host):
+        with self._lock:
+            if host not in self._limiters:
+                self._limiters[host] = HostLimiter(**self.limiter_kwargs)
+            return self._limiters[host]
+
+
+# Shared by default between API instances, so that clients of the same
+# backend share its cap.
+default_scheduler = Scheduler()
@@ -0,0 +1,266 @@
+"""Read-only, memory-mappable guide snapshots.
+
+`write_snapshot` lays a `ProgramGuide` out as fixed-width records that
+refer into a string table, so that other processes can open it with
+`GuideSnapshot` and query `snapshot.guide` through the usual
+`channels`/`programs`/`search` API. Strings are only decoded from the
+mapping as they are accessed, and the mapping itself is shared between
+all processes that open the same file.
+
+Layout, all little-endian:
+
+    header      HEADER
+    guide       one record of GUIDE_FIELDS string refs
+    channels    per channel, CHANNEL_FIELDS string refs then the index
+                of its first program and its number of programs
+    programs    per program, PROGRAM_FIELDS string refs
+    strings     UTF-8, de-duplicated
+
+A string ref is an (offset, length) pair into the string table, with
+an offset of MISSING for a field that was not present.
+
+Only the scalar fields are kept; a program's `Recording` and `Artwork`
+are not.
+
+"""
+import collections.abc
+import mmap
+import os
+import struct
+
+from .models import ProgramGuide
+
+
+MAGIC = b'MYTHGSNP'
+VERSION = 1
+MISSING = 0xFFFFFFFF
+
+HEADER = struct.Struct('<8sIII')
+REF = struct.Struct('<II')
+SPAN = struct.Struct('<II')
+
+GUIDE_FIELDS = (
+    'AsOf',
+    'EndTime',
+    'ProtoVer',
+    'StartTime',
+    'StartIndex',
+    'Version',
+    'TotalAvailable',
+    'Count',
+    'Details',
+)
+CHANNEL_FIELDS = (
+    'ChannelName',
+    'ChanId',
+    'CallSign',
+    'IconURL',
+    'ChanNum',
+)
+PROGRAM_FIELDS = (
+    'Title',
+    'SubTitle',
+    'StartTime',
+    'EndTime',
+    'Category',
+    'CatType',
+    'Repeat',
+    'VideoProps',
+    'AudioProps',
+    'SubProps',
+    'SeriesId',
+    'ProgramId',
+)
+
+GUIDE_SIZE = REF.size * len(GUIDE_FIELDS)
+CHANNEL_SIZE = REF.size * len(CHANNEL_FIELDS) + SPAN.size
+PROGRAM_SIZE = REF.size * len(PROGRAM_FIELDS)
+
+
+class _StringTable(object):
+    def __init__(self):
+        self.refs = {}
+        self.chunks = []
+        self.size = 0
+
+    def ref(self, value):
+        if value is None:
+            return (MISSING, 0)
+        value = str(value)
+        if value not in self.refs:
+            encoded = value.encode('utf-8')
+            self.refs[value] = (self.size, len(encoded))
+            self.chunks.append(encoded)
+            self.size += len(encoded)
+        return self.refs[value]
+
+    def pack_refs(self, fields, values):
+        return b''.join(REF.pack(*self.ref(values.get(name))) for name in fields)
+
+
+def write_snapshot(guide, path):
+    """Write `guide`, a `ProgramGuide`, to a snapshot file at `path`.
+
+    The file is written alongside and then moved into place, so
+    processes that already have the old snapshot open are unaffected.
+
+    """
+    guide_dict = guide._guide
+    strings = _StringTable()
+    channel_records = []
+    program_records = []
+
+    for ch_dict in guide_dict['Channels']:
+        programs = ch_dict.get('Programs', [])
+        channel_records.append(
+            strings.pack_refs(CHANNEL_FIELDS, ch_dict) +
+            SPAN.pack(len(program_records), len(programs)))
+        for pr_dict in programs:
+            program_records.append(strings.pack_refs(PROGRAM_FIELDS, pr_dict))
+
+    tmp_path = '{}.tmp{}'.format(path, os.getpid())
+    try:
+        with open(tmp_path, 'wb') as snapshot_file:
+            snapshot_file.write(
+                HEADER.pack(MAGIC, VERSION, len(channel_records), len(program_records)))
+            snapshot_file.write(strings.pack_refs(GUIDE_FIELDS, guide_dict))
+            snapshot_file.writelines(channel_records)
+            snapshot_file.writelines(program_records)
+            snapshot_file.writelines(strings.chunks)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+class _Record(collections.abc.Mapping):
+    """A read-only dict-like view of one record in a snapshot."""
+
+    fields = ()
+
+    def __init__(self, snapshot, offset):
+        self._snapshot = snapshot
+        self._offset = offset
+
+    def _field(self, index):
+        return self._snapshot._string(self._offset + index * REF.size)
+
+    def __getitem__(self, key):
+        try:
+            index = self.fields.index(key)
+        except ValueError:
+            raise KeyError(key)
+        value = self._field(index)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __iter__(self):
+        for index, name in enumerate(self.fields):
+            if self._field(index) is not None:
+                yield name
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+
+class _ProgramRecord(_Record):
+    fields = PROGRAM_FIELDS
+
+
+class _ChannelRecord(_Record):
+    fields = CHANNEL_FIELDS
+
+    def __getitem__(self, key):
+        if key == 'Programs':
+            return self._programs()
+        return super().__getitem__(key)
+
+    def __iter__(self):
+        yield from super().__iter__()
+        yield 'Programs'
+
+    def _programs(self):
+        start, count = SPAN.unpack_from(
+            self._snapshot._mmap, self._offset + REF.size * len(CHANNEL_FIELDS))
+        return _Records(self._snapshot, _ProgramRecord, self._snapshot._programs_offset,
+                        PROGRAM_SIZE, start, count)
+
+
+class _GuideRecord(_Record):
+    fields = GUIDE_FIELDS
+
+    def __getitem__(self, key):
+        if key == 'Channels':
+            return _Records(self._snapshot, _ChannelRecord, self._snapshot._channels_offset,
+                            CHANNEL_SIZE, 0, self._snapshot.num_channels)
+        return super().__getitem__(key)
+
+    def __iter__(self):
+        yield from super().__iter__()
+        yield 'Channels'
+
+
+class _Records(collections.abc.Sequence):
+    """A read-only list-like view of consecutive records."""
+
+    def __init__(self, snapshot, record_cls, table_offset, record_size, start, count):
+        self._snapshot = snapshot
+        self._record_cls = record_cls
+        self._table_offset = table_offset
+        self._record_size = record_size
+        self._start = start
+        self._count = count
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        offset = self._table_offset + (self._start + index) * self._record_size
+        return self._record_cls(self._snapshot, offset)
+
+
+class GuideSnapshot(object):
+    """A snapshot file written by `write_snapshot`, mapped read-only.
+
+    `guide` is a `ProgramGuide` backed by the mapping.
+
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as snapshot_file:
+            self._mmap = mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.num_channels, self.num_programs = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            raise ValueError('Not a guide snapshot: {}'.format(path))
+        if version != VERSION:
+            raise ValueError('Unsupported guide snapshot version {}'.format(version))
+        self._channels_offset = HEADER.size + GUIDE_SIZE
+        self._programs_offset = self._channels_offset + self.num_channels * CHANNEL_SIZE
+        self._strings_offset = self._programs_offset + self.num_programs * PROGRAM_SIZE
+        self._buffer = memoryview(self._mmap)
+        self.guide = ProgramGuide(_guide=_GuideRecord(self, HEADER.size))
+
+    def _string(self, ref_offset):
+        offset, length = REF.unpack_from(self._mmap, ref_offset)
+        if offset == MISSING:
+            return None
+        start = self._strings_offset + offset
+        return str(self._buffer[start:start + length], 'utf-8')
+
+    def close(self):
+        self._buffer.release()
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
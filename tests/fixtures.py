@@ -0,0 +1,65 @@
+def make_program(title, start, end, video_props='0', **extra):
+    program = dict(
+        StartTime=start,
+        EndTime=end,
+        Title=title,
+        SubTitle='',
+        Category='News',
+        CatType='series',
+        Repeat='false',
+        VideoProps=video_props,
+        AudioProps='0',
+        SubProps='0',
+        Artwork=dict(ArtworkInfos=[]),
+        Recording=dict(RecordedId=0, Status='0'),
+        Description='Not in the validator',
+    )
+    program.update(extra)
+    return program
+
+
+def make_channel(chan_id, chan_num, programs):
+    return dict(
+        ChannelName='Channel {}'.format(chan_num),
+        ChanId=str(chan_id),
+        CallSign='CH{}'.format(chan_num),
+        IconURL='',
+        ChanNum=str(chan_num),
+        Programs=programs,
+    )
+
+
+def make_guide(channels):
+    return dict(
+        AsOf='2026-10-20T00:00:00Z',
+        StartTime='2026-10-20T00:00:00Z',
+        EndTime='2026-10-21T00:00:00Z',
+        ProtoVer='91',
+        StartIndex='0',
+        Version='31',
+        TotalAvailable=str(len(channels)),
+        Count=str(len(channels)),
+        Details='true',
+        Channels=channels,
+    )
+
+
+def news_guide():
+    """Two channels showing the same news, the second in HD, plus a
+    film on the first.
+
+    """
+    return make_guide([
+        make_channel(1001, 1, [
+            make_program('News', '2026-10-20T18:00:00Z', '2026-10-20T18:30:00Z',
+                         SeriesId='SH1', ProgramId='EP1'),
+            make_program('Film', '2026-10-20T18:30:00Z', '2026-10-20T20:00:00Z',
+                         SeriesId='MV1', ProgramId='MV1'),
+        ]),
+        make_channel(1002, 2, [
+            make_program('News', '2026-10-20T18:00:00Z', '2026-10-20T18:30:00Z', video_props='1',
+                         SeriesId='SH1', ProgramId='EP1'),
+            make_program('News', '2026-10-20T22:00:00Z', '2026-10-20T22:30:00Z', video_props='1',
+                         SeriesId='SH1', ProgramId='EP2'),
+        ]),
+    ])
@@ -0,0 +1,193 @@
+import threading
+import time
+import unittest
+from unittest import mock
+
+import requests
+
+from mythtv_client.api import API
+from mythtv_client.resilience import Policy
+from mythtv_client.scheduling import NORMAL, Scheduler
+
+
+def make_response(status_code=200, json=None):
+    response = mock.Mock(status_code=status_code, content=b'')
+    response.json.return_value = json or {}
+    if status_code >= 400:
+        response.raise_for_status.side_effect = requests.HTTPError(status_code)
+    return response
+
+
+class RetryTest(unittest.TestCase):
+    def setUp(self):
+        self.api = API(
+            'http://backend:6544', policy=Policy(retries=2, backoff=0), scheduler=Scheduler())
+
+    def test_retries_timeouts_and_5xx(self):
+        outcomes = [make_response(503), requests.ReadTimeout(), make_response(json={'ok': 1})]
+        with mock.patch('mythtv_client.api.requests.get', side_effect=outcomes) as get:
+            self.assertEqual(self.api._request('Guide', 'GetProgramGuide', {}), {'ok': 1})
+        self.assertEqual(get.call_count, 3)
+        self.assertEqual(
+            self.api.metrics.outcomes('Guide', 'GetProgramGuide'),
+            {'http_error': 1, 'timeout': 1, 'retry': 2, 'success': 1})
+
+    def test_gives_up_after_retries(self):
+        with mock.patch('mythtv_client.api.requests.get', side_effect=requests.ConnectionError()):
+            with self.assertRaises(requests.ConnectionError):
+                self.api._request('Guide', 'GetProgramGuide', {})
+        outcomes = self.api.metrics.outcomes('Guide', 'GetProgramGuide')
+        self.assertEqual(outcomes['connection_error'], 3)
+        self.assertEqual(outcomes['failure'], 1)
+
+    def test_does_not_retry_client_errors(self):
+        with mock.patch('mythtv_client.api.requests.get', return_value=make_response(404)) as get:
+            with self.assertRaises(requests.HTTPError):
+                self.api._request('Guide', 'GetProgramGuide', {})
+        self.assertEqual(get.call_count, 1)
+
+    def test_does_not_retry_posts(self):
+        with mock.patch('mythtv_client.api.requests.post', return_value=make_response(503)) as post:
+            with self.assertRaises(requests.HTTPError):
+                self.api._request('Dvr', 'AddRecordSchedule', {}, post=True)
+        self.assertEqual(post.call_count, 1)
+
+    def test_failed_attempts_are_timed(self):
+        with mock.patch('mythtv_client.api.requests.get', side_effect=requests.ReadTimeout()):
+            with self.assertRaises(requests.ReadTimeout):
+                self.api._request('Guide', 'GetProgramGuide', {})
+        self.assertEqual(len(self.api.metrics.latencies('Guide', 'GetProgramGuide')), 3)
+
+    def test_unexpected_errors_count_as_failures(self):
+        with mock.patch('mythtv_client.api.requests.get', side_effect=ValueError()):
+            with self.assertRaises(ValueError):
+                self.api._request('Guide', 'GetProgramGuide', {})
+        self.assertEqual(self.api.metrics.outcomes('Guide', 'GetProgramGuide'), {'failure': 1})
+
+    def test_passes_endpoint_timeout(self):
+        self.api.policy.timeouts[('Guide', 'GetProgramGuide')] = 120
+        with mock.patch('mythtv_client.api.requests.get', return_value=make_response()) as get:
+            self.api._request('Guide', 'GetProgramGuide', {})
+        self.assertEqual(get.call_args[1]['timeout'], 120)
+
+
+class SchedulerDefaultTest(unittest.TestCase):
+    def test_instances_share_host_limiter_by_default(self):
+        first = API('http://backend:6544')
+        second = API('http://backend:6544/')
+        self.assertIs(
+            first.scheduler.limiter(first.host), second.scheduler.limiter(second.host))
+
+    def test_own_scheduler_is_isolated(self):
+        first = API('http://backend:6544', scheduler=Scheduler())
+        second = API('http://backend:6544')
+        self.assertIsNot(
+            first.scheduler.limiter(first.host), second.scheduler.limiter(second.host))
+
+
+class HedgeTest(unittest.TestCase):
+    def setUp(self):
+        self.api = API(
+            'http://backend:6544',
+            policy=Policy(retries=0, hedge_percentile=50, hedge_min_samples=5),
+            scheduler=Scheduler())
+        for _ in range(5):
+            self.api.metrics.observe('Guide', 'GetProgramGuide', 0.02)
+
+    def test_hedge_wins_when_first_is_slow(self):
+        calls = []
+
+        def get(url, headers, timeout):
+            calls.append(url)
+            if len(calls) == 1:
+                time.sleep(0.5)
+            return make_response(json={'attempt': len(calls)})
+
+        with mock.patch('mythtv_client.api.requests.get', side_effect=get):
+            self.assertEqual(self.api._request('Guide', 'GetProgramGuide', {}), {'attempt': 2})
+        outcomes = self.api.metrics.outcomes('Guide', 'GetProgramGuide')
+        self.assertEqual(outcomes['hedge'], 1)
+        self.assertEqual(outcomes['hedge_won'], 1)
+
+    def test_no_hedge_when_first_is_fast(self):
+        with mock.patch('mythtv_client.api.requests.get', return_value=make_response()) as get:
+            self.api._request('Guide', 'GetProgramGuide', {})
+        self.assertEqual(get.call_count, 1)
+        self.assertNotIn('hedge', self.api.metrics.outcomes('Guide', 'GetProgramGuide'))
+
+    def test_time_queued_for_a_slot_does_not_trigger_hedge(self):
+        self.api.scheduler = Scheduler(initial=1, maximum=1)
+        limiter = self.api.scheduler.limiter(self.api.host)
+        limiter.acquire(NORMAL)
+        threading.Timer(0.2, limiter.release, args=(0.01,)).start()
+
+        with mock.patch('mythtv_client.api.requests.get', return_value=make_response()) as get:
+            self.api._request('Guide', 'GetProgramGuide', {})
+        self.assertEqual(get.call_count, 1)
+        self.assertNotIn('hedge', self.api.metrics.outcomes('Guide', 'GetProgramGuide'))
+
+    def test_abandoned_hedge_is_closed_and_does_not_shrink_cap(self):
+        calls = []
+        first_done = threading.Event()
+
+        def get(url, headers, timeout):
+            calls.append(url)
+            if len(calls) == 1:
+                time.sleep(0.3)
+                first_done.set()
+                raise requests.ReadTimeout()
+            return make_response()
+
+        limiter = self.api.scheduler.limiter(self.api.host)
+        with mock.patch('mythtv_client.api.requests.get', side_effect=get):
+            self.api._request('Guide', 'GetProgramGuide', {})
+            limit = limiter.limit
+            first_done.wait()
+            while limiter.in_flight:
+                time.sleep(0.01)
+        self.assertEqual(limiter.limit, limit)
+
+    def test_losing_response_is_closed(self):
+        calls = []
+        losing = make_response()
+
+        def get(url, headers, timeout):
+            calls.append(url)
+            if len(calls) == 1:
+                time.sleep(0.3)
+                return losing
+            return make_response()
+
+        with mock.patch('mythtv_client.api.requests.get', side_effect=get):
+            self.api._request('Guide', 'GetProgramGuide', {})
+            deadline = time.monotonic() + 2
+            while not losing.close.called and time.monotonic() < deadline:
+                time.sleep(0.01)
+        losing.close.assert_called_once_with()
+
+    def test_no_hedge_without_a_spare_slot(self):
+        self.api.scheduler = Scheduler(initial=1, maximum=1)
+
+        def get(url, headers, timeout):
+            time.sleep(0.2)
+            return make_response()
+
+        with mock.patch('mythtv_client.api.requests.get', side_effect=get) as get_mock:
+            self.api._request('Guide', 'GetProgramGuide', {})
+        self.assertEqual(get_mock.call_count, 1)
+        outcomes = self.api.metrics.outcomes('Guide', 'GetProgramGuide')
+        self.assertEqual(outcomes['hedge_skipped'], 1)
+        self.assertNotIn('hedge', outcomes)
+
+    def test_hedge_decided_while_waiting_is_not_sent(self):
+        abandoned = threading.Event()
+        abandoned.set()
+        limiter = self.api.scheduler.limiter(self.api.host)
+        with mock.patch('mythtv_client.api.requests.get') as get:
+            response = self.api._send(
+                'Guide', 'GetProgramGuide', 'http://backend:6544/', {}, {}, False, NORMAL,
+                abandoned=abandoned)
+        self.assertIsNone(response)
+        get.assert_not_called()
+        self.assertEqual(limiter.in_flight, 0)
+
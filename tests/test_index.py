@@ -0,0 +1,61 @@
+import unittest
+
+from mythtv_client.index import GuideIndex, chan_num_key
+from mythtv_client.models import ProgramGuide
+
+from .fixtures import make_channel, make_guide, make_program, news_guide
+
+
+class GuideIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.guide = ProgramGuide(_guide=ProgramGuide.decode(news_guide()))
+        self.index = GuideIndex(self.guide)
+
+    def test_series_keeps_best_copy_per_airing(self):
+        found = self.index.series('SH1')
+        self.assertEqual(
+            [(showing.program.StartTime, showing.program.channel.ChanNum) for showing in found],
+            [('2026-10-20T18:00:00Z', '2'), ('2026-10-20T22:00:00Z', '2')])
+        self.assertEqual([showing.video_props for showing in found], [1, 1])
+
+    def test_episode(self):
+        self.assertEqual(len(self.index.episode('EP1')), 1)
+        self.assertEqual(self.index.episode('missing'), ())
+
+    def test_title_is_case_insensitive(self):
+        self.assertEqual(len(self.index.title('NEWS')), 2)
+
+    def test_of_program(self):
+        program = next(self.guide.programs)
+        self.assertEqual(len(self.index.series_of(program)), 2)
+        self.assertEqual(len(self.index.episode_of(program)), 1)
+
+    def test_falls_back_to_title(self):
+        guide = ProgramGuide(_guide=ProgramGuide.decode(make_guide([
+            make_channel(1001, 1, [
+                make_program('Quiz', '2026-10-20T18:00:00Z', '2026-10-20T18:30:00Z',
+                             SubTitle='Final'),
+            ]),
+        ])))
+        index = GuideIndex(guide)
+        program = next(guide.programs)
+        self.assertEqual(len(index.series_of(program)), 1)
+        self.assertEqual(len(index.episode_of(program)), 1)
+        self.assertEqual(index.title('quiz'), index.series_of(program))
+
+    def test_agrees_with_search_on_subchannels(self):
+        guide = ProgramGuide(_guide=ProgramGuide.decode(make_guide([
+            make_channel(1010, 10, [
+                make_program('News', '2026-10-20T18:00:00Z', '2026-10-20T18:30:00Z')]),
+            make_channel(1021, '2_1', [
+                make_program('News', '2026-10-20T18:00:00Z', '2026-10-20T18:30:00Z')]),
+        ])))
+        [best] = GuideIndex(guide).title('News')
+        [found] = guide.search('News')
+        self.assertEqual(best.program.channel.ChanNum, '2_1')
+        self.assertEqual(found.channel.ChanNum, '2_1')
+
+
+class ChanNumKeyTest(unittest.TestCase):
+    def test_orders_subchannels(self):
+        self.assertEqual(sorted(['10', '2_1', '2'], key=chan_num_key), ['2', '2_1', '10'])
@@ -0,0 +1,69 @@
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from unittest import mock
+
+from mythtv_client.models import ProgramGuide, VideoProps
+
+from .fixtures import make_channel, make_guide, make_program, news_guide
+
+
+class ProgramGuideDecodeTest(unittest.TestCase):
+    def test_decode_projects_program_fields(self):
+        guide = ProgramGuide(_guide=ProgramGuide.decode(news_guide(), program_fields=['Category']))
+        program = next(guide.programs)
+        self.assertEqual(
+            set(program._program), {'Title', 'StartTime', 'EndTime', 'Category'})
+        self.assertEqual(program.Category, 'News')
+
+    def test_decode_without_projection_keeps_details(self):
+        guide = ProgramGuide(_guide=ProgramGuide.decode(news_guide()))
+        self.assertIn('Recording', next(guide.programs)._program)
+
+    def test_decode_on_executor_keeps_channel_order(self):
+        raw = make_guide([
+            make_channel(1000 + num, num, [
+                make_program('Show', '2026-10-20T18:00:00Z', '2026-10-20T19:00:00Z')])
+            for num in range(1, 12)
+        ])
+        with ProcessPoolExecutor(2) as executor:
+            decoded = ProgramGuide.decode(
+                raw, program_fields=['Category'], executor=executor, chunk_size=3)
+        self.assertEqual(decoded, ProgramGuide.decode(raw, program_fields=['Category']))
+        self.assertEqual(
+            [ch['ChanNum'] for ch in decoded['Channels']], [str(num) for num in range(1, 12)])
+
+    def test_decode_sends_workers_projected_channels(self):
+        executor = mock.Mock()
+        executor.map.side_effect = map
+        ProgramGuide.decode(news_guide(), program_fields=['Category'], executor=executor)
+        [chunk] = executor.map.call_args[0][1]
+        for ch_dict in chunk:
+            for pr_dict in ch_dict['Programs']:
+                self.assertEqual(set(pr_dict), {'Title', 'StartTime', 'EndTime', 'Category'})
+
+    def test_decode_rejects_bad_chunk_size(self):
+        with self.assertRaises(ValueError):
+            ProgramGuide.decode(news_guide(), executor=object(), chunk_size=0)
+
+
+class ProgramGuideSearchTest(unittest.TestCase):
+    def test_search_picks_hd_copy(self):
+        guide = ProgramGuide(_guide=ProgramGuide.decode(news_guide()))
+        found = guide.search('news')
+        self.assertEqual([pr.channel.ChanNum for pr in found], ['2', '2'])
+
+    def test_search_on_projected_guide(self):
+        guide = ProgramGuide(_guide=ProgramGuide.decode(news_guide(), program_fields=['Category']))
+        found = guide.search('news')
+        # Without VideoProps neither copy is known to be HD, so the
+        # lowest channel number wins.
+        self.assertEqual([pr.channel.ChanNum for pr in found], ['1', '2'])
+
+    def test_search_limit(self):
+        guide = ProgramGuide(_guide=ProgramGuide.decode(news_guide()))
+        self.assertEqual(len(guide.search('news', limit=1)), 1)
+
+
+class VideoPropsTest(unittest.TestCase):
+    def test_decode(self):
+        self.assertEqual(VideoProps.decode(1 | 16), {'hdtv', '1080'})
@@ -0,0 +1,201 @@
+import unittest
+from datetime import datetime
+from unittest import mock
+
+from mythtv_client.api import AddRecordSchedule
+from mythtv_client.models import ProgramGuide, RecRule, RecordingType
+from mythtv_client.planner import Planner, TunerConflictError
+
+from .fixtures import make_channel, make_guide, make_program
+
+
+NOW = datetime(2026, 10, 20, 12, 0)
+
+
+def make_rule(rule_type, title, chan_id=1001, start=None, **extra):
+    rule = dict(
+        Inactive=False,
+        Type=rule_type,
+        Title=title,
+        ChanId=chan_id,
+        StartTime=start,
+        StartOffset=0,
+        EndOffset=0,
+        PreferredInput=0,
+    )
+    rule.update(extra)
+    return RecRule(_recrule=rule)
+
+
+def make_test_guide():
+    return ProgramGuide(_guide=make_guide([
+        make_channel(1001, 1, [
+            make_program('News', '2026-10-20T18:00:00Z', '2026-10-20T18:30:00Z'),
+            make_program('Quiz', '2026-10-20T18:30:00Z', '2026-10-20T19:00:00Z'),
+            make_program('News', '2026-10-21T18:00:00Z', '2026-10-21T18:30:00Z'),
+        ]),
+        make_channel(1002, 2, [
+            make_program('Film', '2026-10-20T18:15:00Z', '2026-10-20T20:00:00Z'),
+            make_program('News', '2026-10-20T18:00:00Z', '2026-10-20T18:30:00Z', video_props='1'),
+        ]),
+    ]))
+
+
+def find(guide, title, start, chan_num='1'):
+    for pr in guide.programs:
+        if (pr.Title, pr.StartTime, pr.channel.ChanNum) == (title, start, chan_num):
+            return pr
+    raise LookupError(title)
+
+
+class PlannerExpandTest(unittest.TestCase):
+    def setUp(self):
+        self.guide = make_test_guide()
+
+    def test_record_all_once_per_slot(self):
+        planner = Planner([make_rule(RecordingType.all_record, 'news')], self.guide, now=NOW)
+        self.assertEqual(
+            [airing.start for airing in planner.airings],
+            [datetime(2026, 10, 20, 18, 0), datetime(2026, 10, 21, 18, 0)])
+
+    def test_single_record_and_offsets(self):
+        rule = make_rule(
+            RecordingType.single_record, 'News', start=datetime(2026, 10, 21, 18, 0),
+            StartOffset=2, EndOffset=5)
+        planner = Planner([rule], self.guide, now=NOW)
+        [airing] = planner.airings
+        self.assertEqual(airing.start, datetime(2026, 10, 21, 17, 58))
+        self.assertEqual(airing.end, datetime(2026, 10, 21, 18, 35))
+
+    def test_daily_matches_time_of_day(self):
+        rule = make_rule(RecordingType.record_daily, 'News', start=datetime(2026, 1, 1, 18, 0))
+        planner = Planner([rule], self.guide, now=NOW)
+        self.assertEqual(len(planner.airings), 2)
+
+    def test_record_one_takes_first(self):
+        planner = Planner([make_rule(RecordingType.record_one, 'News')], self.guide, now=NOW)
+        self.assertEqual([airing.start for airing in planner.airings],
+                         [datetime(2026, 10, 20, 18, 0)])
+
+    def test_skips_inactive_off_and_past(self):
+        rules = [
+            make_rule(RecordingType.all_record, 'News', Inactive=True),
+            make_rule(RecordingType.not_recording, 'Quiz'),
+        ]
+        self.assertEqual(Planner(rules, self.guide, now=NOW).airings, [])
+        later = datetime(2026, 10, 22)
+        rules = [make_rule(RecordingType.all_record, 'News')]
+        self.assertEqual(Planner(rules, self.guide, now=later).airings, [])
+
+    def test_showing_matched_by_two_rules_is_planned_once(self):
+        rules = [
+            make_rule(RecordingType.all_record, 'News'),
+            make_rule(RecordingType.record_one, 'News'),
+        ]
+        planner = Planner(rules, self.guide, now=NOW)
+        self.assertEqual(len(planner.airings), 2)
+        self.assertEqual(planner.peak(), (1, datetime(2026, 10, 20, 18, 0)))
+        self.assertEqual(planner.overlaps(), [])
+
+    def test_skips_rules_without_start_time(self):
+        rules = [
+            make_rule(RecordingType.single_record, 'News'),
+            make_rule(RecordingType.record_weekly, 'News'),
+            make_rule(RecordingType.all_record, 'Quiz'),
+        ]
+        planner = Planner(rules, self.guide, now=NOW)
+        self.assertEqual([airing.program.Title for airing in planner.airings], ['Quiz'])
+
+
+class PlannerLoadTest(unittest.TestCase):
+    def setUp(self):
+        self.guide = make_test_guide()
+        rules = [
+            make_rule(RecordingType.all_record, 'News'),
+            make_rule(RecordingType.all_record, 'Quiz'),
+        ]
+        self.planner = Planner(rules, self.guide, tuners=1, now=NOW)
+
+    def test_back_to_back_do_not_overlap(self):
+        self.assertEqual(self.planner.peak(), (1, datetime(2026, 10, 20, 18, 0)))
+        self.assertEqual(self.planner.overlaps(), [])
+
+    def test_overlap_counts(self):
+        self.planner.add(find(self.guide, 'Film', '2026-10-20T18:15:00Z', '2'))
+        self.assertEqual(self.planner.peak(), (2, datetime(2026, 10, 20, 18, 15)))
+        self.assertEqual(len(self.planner.overlaps()), 2)
+
+    def test_check_rejects_over_subscription(self):
+        with self.assertRaises(TunerConflictError):
+            self.planner.check(find(self.guide, 'Film', '2026-10-20T18:15:00Z', '2'))
+
+    def test_add_replaces_already_planned_showing(self):
+        news = find(self.guide, 'News', '2026-10-20T18:00:00Z', '2')
+        self.planner.add(news, start_offset=5)
+        self.assertEqual(self.planner.peak(), (1, datetime(2026, 10, 20, 17, 55)))
+        [airing] = self.planner.planned(news)
+        self.assertEqual(airing.start, datetime(2026, 10, 20, 17, 55))
+
+    def test_check_ignores_already_planned_showing(self):
+        self.planner.check(find(self.guide, 'News', '2026-10-20T18:00:00Z'))
+        # The HD copy on another channel is the same showing.
+        self.planner.check(find(self.guide, 'News', '2026-10-20T18:00:00Z', '2'))
+
+
+class PlannerBackToBackTest(unittest.TestCase):
+    def setUp(self):
+        self.guide = make_test_guide()
+        rules = [make_rule(RecordingType.all_record, 'News')]
+        self.planner = Planner(rules, self.guide, tuners=1, now=NOW)
+        self.quiz = find(self.guide, 'Quiz', '2026-10-20T18:30:00Z')
+
+    def test_back_to_back_fits(self):
+        self.planner.check(self.quiz)
+
+    def test_check_counts_offsets(self):
+        with self.assertRaises(TunerConflictError):
+            self.planner.check(self.quiz, start_offset=5)
+
+
+class RecordTest(unittest.TestCase):
+    def setUp(self):
+        self.guide = make_test_guide()
+        self.planner = Planner([], self.guide, tuners=1, now=NOW)
+        self.api = mock.Mock()
+        self.endpoint = AddRecordSchedule(self.api)
+        self.endpoint._request = mock.Mock()
+
+    def schedule_with(self, **extra):
+        recrule = dict(
+            CallSign='CH1', SubTitle='', LastRecorded=None, NextRecording=None,
+            AverageDelay=0, Id=0, LastDeleted=None, StartOffset=0, EndOffset=0,
+            PreferredInput=0)
+        recrule.update(extra)
+        self.api.Dvr.GetRecordSchedule.return_value = mock.Mock(_recrule=recrule)
+
+    def test_record_adds_to_planner_with_offsets(self):
+        self.schedule_with(StartOffset=2, EndOffset=10, PreferredInput=3)
+        news = find(self.guide, 'News', '2026-10-20T18:00:00Z')
+        self.endpoint.record(news, planner=self.planner)
+        [airing] = self.planner.airings
+        self.assertEqual(
+            (airing.start, airing.end, airing.input),
+            (datetime(2026, 10, 20, 17, 58), datetime(2026, 10, 20, 18, 40), 3))
+        self.assertEqual(self.endpoint._request.call_count, 1)
+
+    def test_record_rejects_before_posting(self):
+        self.schedule_with(EndOffset=10)
+        self.endpoint.record(find(self.guide, 'News', '2026-10-20T18:00:00Z'), planner=self.planner)
+        with self.assertRaises(TunerConflictError):
+            self.endpoint.record(
+                find(self.guide, 'Quiz', '2026-10-20T18:30:00Z'), planner=self.planner)
+        self.assertEqual(self.endpoint._request.call_count, 1)
+
+    def test_record_of_rule_covered_showing_is_not_counted_twice(self):
+        planner = Planner(
+            [make_rule(RecordingType.all_record, 'News')], self.guide, tuners=2, now=NOW)
+        self.schedule_with()
+        self.endpoint.record(find(self.guide, 'News', '2026-10-20T18:00:00Z'), planner=planner)
+        self.assertEqual(planner.peak(), (1, datetime(2026, 10, 20, 18, 0)))
+        planner.check(find(self.guide, 'Film', '2026-10-20T18:15:00Z', '2'))
+
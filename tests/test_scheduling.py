@@ -0,0 +1,79 @@
+import threading
+import time
+import unittest
+
+from mythtv_client.scheduling import BULK, INTERACTIVE, NORMAL, HostLimiter, Scheduler
+
+
+class HostLimiterTest(unittest.TestCase):
+    def test_waiters_go_by_priority_then_arrival(self):
+        limiter = HostLimiter(initial=1, maximum=1)
+        limiter.acquire(NORMAL)
+        order = []
+
+        def wait_for_slot(name, priority):
+            limiter.acquire(priority)
+            order.append(name)
+            limiter.release(0.01)
+
+        threads = []
+        for name, priority in [('bulk1', BULK), ('bulk2', BULK), ('interactive', INTERACTIVE)]:
+            thread = threading.Thread(target=wait_for_slot, args=(name, priority))
+            thread.start()
+            threads.append(thread)
+            # Make sure each is queued before the next arrives.
+            while len(limiter._waiting) < len(threads):
+                time.sleep(0.001)
+
+        limiter.release(0.01)
+        for thread in threads:
+            thread.join()
+        self.assertEqual(order, ['interactive', 'bulk1', 'bulk2'])
+
+    def test_additive_increase(self):
+        limiter = HostLimiter(initial=2, maximum=4)
+        for _ in range(4):
+            limiter.acquire()
+            limiter.release(0.01)
+        self.assertGreater(limiter.limit, 3)
+        self.assertLessEqual(limiter.limit, 4)
+
+    def test_multiplicative_decrease_once_per_target_latency(self):
+        limiter = HostLimiter(initial=8, target_latency=10, decrease=0.5)
+        limiter.acquire()
+        limiter.acquire()
+        limiter.release(0.01, ok=False)
+        limiter.release(0.01, ok=False)
+        self.assertEqual(limiter.limit, 4)
+
+    def test_slow_response_decreases(self):
+        limiter = HostLimiter(initial=8, target_latency=1, decrease=0.5)
+        limiter.acquire()
+        limiter.release(5)
+        self.assertEqual(limiter.limit, 4)
+
+    def test_slow_for_endpoint_baseline_decreases(self):
+        limiter = HostLimiter(initial=8, target_latency=1, decrease=0.5, slow_factor=3)
+        limiter.acquire()
+        limiter.release(20, baseline=5)
+        self.assertEqual(limiter.limit, 4)
+
+    def test_usual_latency_for_slow_endpoint_does_not_decrease(self):
+        limiter = HostLimiter(initial=8, target_latency=1, slow_factor=3)
+        limiter.acquire()
+        limiter.release(6, baseline=5)
+        self.assertGreater(limiter.limit, 8)
+
+    def test_discard_leaves_cap_alone(self):
+        limiter = HostLimiter(initial=8)
+        limiter.acquire()
+        limiter.discard()
+        self.assertEqual(limiter.limit, 8)
+        self.assertEqual(limiter.in_flight, 0)
+
+
+class SchedulerTest(unittest.TestCase):
+    def test_one_limiter_per_host(self):
+        scheduler = Scheduler(initial=2)
+        self.assertIs(scheduler.limiter('a:6544'), scheduler.limiter('a:6544'))
+        self.assertIsNot(scheduler.limiter('a:6544'), scheduler.limiter('b:6544'))
@@ -0,0 +1,60 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from mythtv_client.models import ProgramGuide
+from mythtv_client.snapshot import GuideSnapshot, write_snapshot
+
+from .fixtures import news_guide
+
+
+class SnapshotTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'guide.snap')
+        self.guide = ProgramGuide(_guide=ProgramGuide.decode(news_guide()))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_round_trip(self):
+        write_snapshot(self.guide, self.path)
+        with GuideSnapshot(self.path) as snapshot:
+            guide = snapshot.guide
+            self.assertEqual(guide.StartTime, self.guide.StartTime)
+            self.assertEqual(
+                [(ch.ChanNum, ch.ChannelName) for ch in guide.channels],
+                [(ch.ChanNum, ch.ChannelName) for ch in self.guide.channels])
+            fields = ['Title', 'SubTitle', 'StartTime', 'EndTime', 'VideoProps', 'SeriesId',
+                      'ProgramId']
+            self.assertEqual(
+                [[getattr(pr, name) for name in fields] for pr in guide.programs],
+                [[getattr(pr, name) for name in fields] for pr in self.guide.programs])
+
+    def test_search(self):
+        write_snapshot(self.guide, self.path)
+        with GuideSnapshot(self.path) as snapshot:
+            found = snapshot.guide.search('news')
+            self.assertEqual(
+                [(pr.StartTime, pr.channel.ChanNum) for pr in found],
+                [(pr.StartTime, pr.channel.ChanNum) for pr in self.guide.search('news')])
+
+    def test_details_are_not_kept(self):
+        write_snapshot(self.guide, self.path)
+        with GuideSnapshot(self.path) as snapshot:
+            program = next(snapshot.guide.programs)
+            self.assertNotIn('Recording', program._program)
+
+    def test_rejects_other_files(self):
+        with open(self.path, 'wb') as other_file:
+            other_file.write(b'\0' * 64)
+        with self.assertRaises(ValueError):
+            GuideSnapshot(self.path)
+
+    def test_failed_write_leaves_no_temp_file(self):
+        with mock.patch('mythtv_client.snapshot.os.replace', side_effect=OSError()):
+            with self.assertRaises(OSError):
+                write_snapshot(self.guide, self.path)
+        self.assertEqual(os.listdir(self.tmp_dir), [])